@@ -1,21 +1,108 @@
-from flask import Flask, request, jsonify, session, send_from_directory, render_template
+from flask import Flask, Response, g, request, jsonify, session, send_from_directory, render_template, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from pydantic import BaseModel, ValidationError
+from flask_caching import Cache
+from flask_compress import Compress
 from flask_cors import CORS
+from flask_session import Session
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, exists, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, raiseload
+from werkzeug.exceptions import NotFound
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
+from apscheduler.schedulers.background import BackgroundScheduler
+import base64
+import functools
+import hashlib
+import orjson
+import redis
 import secrets
 import os
 
-app = Flask(__name__, 
+_ORJSON_OPTS = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster serialization of list endpoints"""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=_ORJSON_OPTS, default=str).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+def _ndjson_line(obj):
+    """One NDJSON line, serialized with the same options as the provider"""
+    return orjson.dumps(obj, option=_ORJSON_OPTS, default=str) + b'\n'
+
+app = Flask(__name__,
             static_folder='.',  # Serve all files from current directory
             static_url_path='')
-app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', secrets.token_hex(32))
+app.json_provider_class = OrjsonProvider
+app.json = OrjsonProvider(app)
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
+if not app.config['SECRET_KEY']:
+    if 'gunicorn' in os.environ.get('SERVER_SOFTWARE', ''):
+        # With multiple workers, a per-process random key means sessions
+        # signed by one worker are rejected by the others
+        raise RuntimeError('SECRET_KEY must be set when running under gunicorn')
+    # Single-process dev server: a fresh key per run is harmless
+    app.config['SECRET_KEY'] = secrets.token_hex(32)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///plaready.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True
+}
+
+# Server-side sessions: with Redis configured, cookies shrink to a session
+# ID and session lookups become O(1) memory hits instead of cookie parsing.
+# Falls back to signed-cookie sessions in dev when REDIS_URL is unset.
+redis_client = redis.Redis.from_url(os.environ['REDIS_URL']) if os.environ.get('REDIS_URL') else None
+if redis_client:
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = redis_client
+    app.config['SESSION_USE_SIGNER'] = True
+    Session(app)
+
+# Read-through cache for rarely-changing lookups (service catalog, coupons).
+# Shared across workers when Redis is available, per-process in dev.
+if redis_client:
+    cache = Cache(app, config={'CACHE_TYPE': 'RedisCache',
+                               'CACHE_REDIS_URL': os.environ['REDIS_URL']})
+else:
+    cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache'})
+
+# Brotli/gzip response compression: the list endpoints' JSON is highly
+# repetitive (keys, status strings, dates) and shrinks 5-10x on the wire
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_LEVEL'] = 4
+# The default mimetype list misses application/x-ndjson, which the
+# streamed order lists use; cover everything this app serves
+app.config['COMPRESS_MIMETYPES'] = [
+    'text/html', 'text/css', 'application/javascript', 'application/json',
+    'application/x-ndjson'
+]
+Compress(app)
 
 CORS(app, supports_credentials=True)
 db = SQLAlchemy(app)
 
+def _sqlite_pragmas(dbapi_con, _):
+    """Enable WAL so concurrent readers aren't serialized behind the writer"""
+    cur = dbapi_con.cursor()
+    cur.execute("PRAGMA journal_mode=WAL")
+    cur.execute("PRAGMA synchronous=NORMAL")
+    cur.execute("PRAGMA busy_timeout=30000")
+    cur.close()
+
+with app.app_context():
+    if db.engine.url.drivername == 'sqlite':
+        event.listens_for(db.engine, 'connect')(_sqlite_pragmas)
+
 # ============================================================================
 # DATABASE MODELS
 # ============================================================================
@@ -31,8 +118,12 @@ class User(db.Model):
     
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
-    
+
     def check_password(self, password):
+        # Deliberately kept at werkzeug's default cost: only actual logins
+        # pay the hash (per-request auth goes through the Redis auth
+        # cache), and lowering the parameters would weaken every stored
+        # credential for negligible latency gain
         return check_password_hash(self.password_hash, password)
 
 class Partner(db.Model):
@@ -102,6 +193,13 @@ class Order(db.Model):
     partner = db.relationship('Partner', foreign_keys=[partner_id])
     service = db.relationship('Service')
 
+    # Composite indexes for the hot list-endpoint filter/sort predicates
+    __table_args__ = (
+        db.Index('ix_orders_customer_created', 'customer_id', 'created_at'),
+        db.Index('ix_orders_partner_status', 'partner_id', 'status'),
+        db.Index('ix_orders_status_created', 'status', 'created_at'),
+    )
+
 class Coupon(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(50), unique=True, nullable=False)
@@ -115,21 +213,67 @@ class Coupon(db.Model):
     usage_count = db.Column(db.Integer, default=0)
     is_active = db.Column(db.Boolean, default=True)
 
+    __table_args__ = (
+        db.Index('ix_coupon_code_active', 'code', 'is_active'),
+    )
+
 # ============================================================================
-# STATIC FILE ROUTES
+# QUERY HELPERS
 # ============================================================================
 
-@app.route('/')
-def index():
-    return send_from_directory('.', 'index.html')
+def list_options(*loads):
+    """Loader options for list queries.
+
+    Returns the declared eager loads, plus a raiseload('*') guard in debug
+    mode so any relationship access not covered by an eager load fails fast
+    instead of silently emitting a lazy query per row.
+    """
+    if app.debug:
+        return loads + (raiseload('*'),)
+    return loads
+
+def require_role(*roles):
+    """Auth guard for protected views.
+
+    With no roles, only requires a logged-in session (401 otherwise);
+    with roles, additionally requires a matching session role (403
+    otherwise, as the partner/admin endpoints always returned). Stores
+    g.user_id / g.role so handlers skip repeated session dict lookups.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            user_id = session.get('user_id')
+            if roles:
+                if not user_id or session.get('role') not in roles:
+                    return jsonify({'error': 'Unauthorized'}), 403
+            elif not user_id:
+                return jsonify({'error': 'Not authenticated'}), 401
+            g.user_id = user_id
+            g.role = session.get('role')
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
 
-@app.route('/<path:path>')
-def serve_static(path):
-    """Serve all static files (HTML, CSS, JS, images)"""
-    try:
-        return send_from_directory('.', path)
-    except:
-        return jsonify({'error': 'File not found'}), 404
+# ============================================================================
+# STATIC FILE ROUTES
+# ============================================================================
+
+# In production, static files should be served by Nginx (see
+# deploy/nginx.conf) so they skip the WSGI stack entirely; set
+# SERVE_STATIC=0 there to reserve Flask for /api/* only.
+if os.environ.get('SERVE_STATIC', '1') == '1':
+    @app.route('/')
+    def index():
+        return send_from_directory('.', 'index.html')
+
+    @app.route('/<path:path>')
+    def serve_static(path):
+        """Serve all static files (HTML, CSS, JS, images)"""
+        try:
+            return send_from_directory('.', path)
+        except NotFound:
+            return jsonify({'error': 'File not found'}), 404
 
 # ============================================================================
 # AUTHENTICATION ENDPOINTS
@@ -139,7 +283,8 @@ def serve_static(path):
 def register():
     data = request.json
     
-    if User.query.filter_by(phone=data['phone']).first():
+    # EXISTS returns a bare boolean instead of hydrating a full User row
+    if db.session.query(exists().where(User.phone == data['phone'])).scalar():
         return jsonify({'error': 'Phone number already registered'}), 400
     
     user = User(
@@ -151,10 +296,17 @@ def register():
     user.set_password(data['password'])
     
     db.session.add(user)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Two concurrent registrations can pass the check; the unique
+        # index on phone is the real arbiter
+        db.session.rollback()
+        return jsonify({'error': 'Phone number already registered'}), 400
     
     session['user_id'] = user.id
     session['role'] = user.role
+    _cache_auth(user)
     
     return jsonify({
         'message': 'Registration successful',
@@ -176,6 +328,11 @@ def login():
     
     session['user_id'] = user.id
     session['role'] = user.role
+    if user.role == 'partner':
+        partner = Partner.query.filter_by(user_id=user.id).first()
+        if partner:
+            session['partner_id'] = partner.id
+    _cache_auth(user)
     
     return jsonify({
         'message': 'Login successful',
@@ -189,61 +346,134 @@ def login():
 
 @app.route('/api/auth/logout', methods=['POST'])
 def logout():
+    user_id = session.get('user_id')
+    if redis_client and user_id:
+        redis_client.delete(f'auth:user:{user_id}')
     session.clear()
     return jsonify({'message': 'Logout successful'})
 
-@app.route('/api/auth/me', methods=['GET'])
-def get_current_user():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not authenticated'}), 401
-    
-    user = User.query.get(session['user_id'])
-    return jsonify({
+def _auth_payload(user):
+    return {
         'id': user.id,
         'name': user.name,
         'phone': user.phone,
         'email': user.email,
         'role': user.role
-    })
+    }
+
+def _cache_auth(user):
+    """Prime the Redis auth cache so hot auth checks skip the DB"""
+    if redis_client:
+        redis_client.setex(f'auth:user:{user.id}', 900,
+                           orjson.dumps(_auth_payload(user)))
+
+def _get_auth_context(user_id):
+    """Resolve the authenticated user, Redis first with DB fallback"""
+    if redis_client:
+        cached = redis_client.get(f'auth:user:{user_id}')
+        if cached:
+            return orjson.loads(cached)
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+    _cache_auth(user)
+    return _auth_payload(user)
+
+@app.route('/api/auth/me', methods=['GET'])
+@require_role()
+def get_current_user():
+    return jsonify(_get_auth_context(g.user_id))
 
 # ============================================================================
 # CUSTOMER ENDPOINTS
 # ============================================================================
 
-@app.route('/api/services', methods=['GET'])
-def get_services():
+@cache.cached(timeout=300, key_prefix='services_payload')
+def _active_services():
     services = Service.query.filter_by(is_active=True).all()
-    return jsonify([{
+    return [{
         'id': s.id,
         'name': s.name,
         'category': s.category,
         'base_price': s.base_price,
         'description': s.description,
         'image_url': s.image_url
-    } for s in services])
+    } for s in services]
+
+@app.route('/api/services', methods=['GET'])
+def get_services():
+    body = orjson.dumps(_active_services())
+    etag = hashlib.md5(body).hexdigest()
+    
+    # Let browsers and CDN edges short-circuit with a 304
+    if request.if_none_match.contains(etag):
+        return '', 304
+    
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
+
+class OrderCreate(BaseModel):
+    """Validated create_order payload.
+
+    model_validate_json parses and validates the request body in
+    pydantic's compiled core, and malformed input surfaces as a
+    structured 400 instead of a KeyError 500.
+    """
+    service_id: int
+    pickup_slot: datetime
+    racquet_type: str | None = None
+    string_type: str | None = None
+    tension: str | None = None
+    pickup_address: str | None = None
+    string_price: float = 0
+    coupon_code: str | None = None
+    payment_method: str = 'online'
+
+def _generate_order_number():
+    """PLR + YYMMDD + day-scoped sequence, base32-packed.
+
+    With Redis, a per-day INCR gives collision-free numbers without
+    consuming OS randomness per order; without it, fall back to a random
+    hex suffix as before.
+    """
+    now = datetime.now()
+    today = f"{now.year % 100:02d}{now.month:02d}{now.day:02d}"
+    if redis_client:
+        seq = redis_client.incr(f'ord:{today}')
+        if seq == 1:
+            redis_client.expire(f'ord:{today}', 172800)
+        suffix = base64.b32encode(seq.to_bytes(3, 'big')).decode().rstrip('=')
+    else:
+        suffix = secrets.token_hex(3).upper()
+    return f"PLR{today}{suffix}"
 
 @app.route('/api/orders', methods=['POST'])
+@require_role()
 def create_order():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not authenticated'}), 401
+    try:
+        data = OrderCreate.model_validate_json(request.data)
+    except ValidationError as e:
+        return jsonify({'error': 'Invalid order data',
+                        'details': e.errors(include_url=False)}), 400
     
-    data = request.json
-    service = Service.query.get(data['service_id'])
+    service = db.session.get(Service, data.service_id)
     
     if not service:
         return jsonify({'error': 'Service not found'}), 404
     
-    # Generate order number
-    order_number = f"PLR{datetime.now().strftime('%Y%m%d')}{secrets.token_hex(3).upper()}"
+    order_number = _generate_order_number()
     
     # Calculate pricing
     base_price = service.base_price
-    string_price = data.get('string_price', 0)
+    string_price = data.string_price
     discount = 0
     
     # Apply coupon if provided
-    if data.get('coupon_code'):
-        coupon = Coupon.query.filter_by(code=data['coupon_code'], is_active=True).first()
+    if data.coupon_code:
+        coupon = _lookup_coupon(data.coupon_code)
         if coupon and coupon.valid_until > datetime.utcnow():
             if coupon.discount_type == 'percentage':
                 discount = (base_price + string_price) * (coupon.discount_value / 100)
@@ -251,65 +481,70 @@ def create_order():
                     discount = min(discount, coupon.max_discount)
             else:
                 discount = coupon.discount_value
-            coupon.usage_count += 1
+            if redis_client:
+                # Defer the write: the flush job folds pending increments
+                # into the DB in bulk, off the order-creation path
+                redis_client.hincrby('coupon_usage', coupon.id, 1)
+            else:
+                # Cached coupon may be detached, so bump the counter in SQL
+                Coupon.query.filter_by(id=coupon.id).update(
+                    {Coupon.usage_count: Coupon.usage_count + 1})
     
     total_price = base_price + string_price - discount
     
-    order = Order(
+    # Core insert: one round trip, no ORM instance or flush bookkeeping
+    stmt = insert(Order).values(
         order_number=order_number,
-        customer_id=session['user_id'],
-        service_id=data['service_id'],
-        racquet_type=data.get('racquet_type'),
-        string_type=data.get('string_type'),
-        tension=data.get('tension'),
-        pickup_address=data.get('pickup_address'),
-        pickup_slot=datetime.fromisoformat(data['pickup_slot']),
+        customer_id=g.user_id,
+        service_id=data.service_id,
+        racquet_type=data.racquet_type,
+        string_type=data.string_type,
+        tension=data.tension,
+        pickup_address=data.pickup_address,
+        pickup_slot=data.pickup_slot,
         base_price=base_price,
         string_price=string_price,
         discount=discount,
         total_price=total_price,
-        payment_method=data.get('payment_method', 'online')
-    )
-    
-    db.session.add(order)
+        payment_method=data.payment_method
+    ).returning(Order.id)
+    order_id = db.session.execute(stmt).scalar_one()
     db.session.commit()
     
     return jsonify({
         'message': 'Order created successfully',
         'order_number': order_number,
-        'order_id': order.id,
+        'order_id': order_id,
         'total_price': total_price
     }), 201
 
 @app.route('/api/orders/my', methods=['GET'])
+@require_role()
 def get_my_orders():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not authenticated'}), 401
-    
-    orders = Order.query.filter_by(customer_id=session['user_id']).order_by(Order.created_at.desc()).all()
-    
-    return jsonify([{
-        'id': o.id,
-        'order_number': o.order_number,
-        'service_name': o.service.name,
-        'status': o.status,
-        'total_price': o.total_price,
-        'pickup_slot': o.pickup_slot.isoformat() if o.pickup_slot else None,
-        'created_at': o.created_at.isoformat()
-    } for o in orders])
+    query = db.session.query(
+        Order.id, Order.order_number, Service.name.label('service_name'),
+        Order.status, Order.total_price, Order.pickup_slot, Order.created_at
+    ).join(Service).filter(Order.customer_id == g.user_id) \
+        .order_by(Order.created_at.desc())
+
+    def generate():
+        for row in query.yield_per(50):
+            yield _ndjson_line(dict(row._mapping))
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/api/orders/<int:order_id>', methods=['GET'])
+@require_role()
 def get_order_details(order_id):
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not authenticated'}), 401
-    
-    order = Order.query.get(order_id)
+    order = db.session.get(Order, order_id,
+                           options=list_options(joinedload(Order.service),
+                                                joinedload(Order.partner)))
     
     if not order:
         return jsonify({'error': 'Order not found'}), 404
     
     # Check authorization
-    if session['role'] == 'customer' and order.customer_id != session['user_id']:
+    if g.role == 'customer' and order.customer_id != g.user_id:
         return jsonify({'error': 'Unauthorized'}), 403
     
     return jsonify({
@@ -323,23 +558,54 @@ def get_order_details(order_id):
         'string_type': order.string_type,
         'tension': order.tension,
         'pickup_address': order.pickup_address,
-        'pickup_slot': order.pickup_slot.isoformat() if order.pickup_slot else None,
+        'pickup_slot': order.pickup_slot,
         'base_price': order.base_price,
         'string_price': order.string_price,
         'discount': order.discount,
         'total_price': order.total_price,
         'status': order.status,
         'payment_status': order.payment_status,
-        'created_at': order.created_at.isoformat(),
+        'created_at': order.created_at,
         'partner': {
             'business_name': order.partner.business_name
         } if order.partner else None
     })
 
+@cache.memoize(30)
+def _lookup_coupon(code):
+    """Fetch an active coupon by code, cached briefly to absorb repeat lookups"""
+    return Coupon.query.filter_by(code=code, is_active=True).first()
+
+def _pending_coupon_usage(coupon_id):
+    """Increments accumulated in Redis but not yet flushed to the DB"""
+    if not redis_client:
+        return 0
+    pending = redis_client.hget('coupon_usage', coupon_id)
+    return int(pending) if pending else 0
+
+def _flush_coupon_usage():
+    """Fold the Redis usage counters into the DB in one UPDATE per coupon"""
+    with redis_client.pipeline() as pipe:
+        pipe.hgetall('coupon_usage')
+        pipe.delete('coupon_usage')
+        counts = pipe.execute()[0]
+    if not counts:
+        return
+    with app.app_context():
+        for coupon_id, n in counts.items():
+            Coupon.query.filter_by(id=int(coupon_id)).update(
+                {Coupon.usage_count: Coupon.usage_count + int(n)})
+        db.session.commit()
+
+if redis_client:
+    _scheduler = BackgroundScheduler()
+    _scheduler.add_job(_flush_coupon_usage, 'interval', seconds=30)
+    _scheduler.start()
+
 @app.route('/api/coupons/validate', methods=['POST'])
 def validate_coupon():
     data = request.json
-    coupon = Coupon.query.filter_by(code=data['code'], is_active=True).first()
+    coupon = _lookup_coupon(data['code'])
     
     if not coupon:
         return jsonify({'error': 'Invalid coupon code'}), 404
@@ -347,7 +613,8 @@ def validate_coupon():
     if coupon.valid_until < datetime.utcnow():
         return jsonify({'error': 'Coupon has expired'}), 400
     
-    if coupon.usage_limit and coupon.usage_count >= coupon.usage_limit:
+    usage_count = coupon.usage_count + _pending_coupon_usage(coupon.id)
+    if coupon.usage_limit and usage_count >= coupon.usage_limit:
         return jsonify({'error': 'Coupon usage limit reached'}), 400
     
     order_value = data.get('order_value', 0)
@@ -374,14 +641,12 @@ def validate_coupon():
 # ============================================================================
 
 @app.route('/api/partner/register', methods=['POST'])
+@require_role()
 def register_partner():
-    if 'user_id' not in session:
-        return jsonify({'error': 'Not authenticated'}), 401
-    
     data = request.json
     
     partner = Partner(
-        user_id=session['user_id'],
+        user_id=g.user_id,
         business_name=data['business_name'],
         address=data['address'],
         city=data['city'],
@@ -394,52 +659,61 @@ def register_partner():
     db.session.add(partner)
     
     # Update user role
-    user = User.query.get(session['user_id'])
+    user = db.session.get(User, g.user_id)
     user.role = 'partner'
     session['role'] = 'partner'
     
     db.session.commit()
-    
+    session['partner_id'] = partner.id
+    # Role changed, so refresh the cached auth context
+    _cache_auth(user)
+
     return jsonify({'message': 'Partner registration submitted for approval'}), 201
 
+def _session_partner_id():
+    """Partner id for the logged-in user, cached in the session at
+    login/registration so partner handlers skip the per-request lookup"""
+    partner_id = session.get('partner_id')
+    if partner_id is None:
+        partner = Partner.query.filter_by(user_id=g.user_id).first()
+        if partner:
+            partner_id = session['partner_id'] = partner.id
+    return partner_id
+
 @app.route('/api/partner/orders', methods=['GET'])
+@require_role('partner')
 def get_partner_orders():
-    if 'user_id' not in session or session['role'] != 'partner':
-        return jsonify({'error': 'Unauthorized'}), 403
+    partner_id = _session_partner_id()
     
-    partner = Partner.query.filter_by(user_id=session['user_id']).first()
-    
-    if not partner:
+    if not partner_id:
         return jsonify({'error': 'Partner profile not found'}), 404
     
     status_filter = request.args.get('status')
-    query = Order.query.filter_by(partner_id=partner.id)
+    query = db.session.query(
+        Order.id, Order.order_number, User.name.label('customer_name'),
+        Service.name.label('service_name'), Order.status, Order.total_price,
+        Order.pickup_slot, Order.created_at
+    ).join(User, Order.customer_id == User.id).join(Service) \
+        .filter(Order.partner_id == partner_id)
     
     if status_filter:
-        query = query.filter_by(status=status_filter)
+        query = query.filter(Order.status == status_filter)
     
-    orders = query.order_by(Order.created_at.desc()).all()
+    rows = query.order_by(Order.created_at.desc()).all()
     
-    return jsonify([{
-        'id': o.id,
-        'order_number': o.order_number,
-        'customer_name': o.customer.name,
-        'service_name': o.service.name,
-        'status': o.status,
-        'total_price': o.total_price,
-        'pickup_slot': o.pickup_slot.isoformat() if o.pickup_slot else None,
-        'created_at': o.created_at.isoformat()
-    } for o in orders])
+    return jsonify([dict(row._mapping) for row in rows])
 
 @app.route('/api/partner/orders/<int:order_id>/status', methods=['PUT'])
+@require_role('partner')
 def update_order_status(order_id):
-    if 'user_id' not in session or session['role'] != 'partner':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    partner = Partner.query.filter_by(user_id=session['user_id']).first()
-    order = Order.query.get(order_id)
-    
-    if not order or order.partner_id != partner.id:
+    partner_id = _session_partner_id()
+
+    if not partner_id:
+        return jsonify({'error': 'Partner profile not found'}), 404
+
+    order = db.session.get(Order, order_id)
+
+    if not order or order.partner_id != partner_id:
         return jsonify({'error': 'Order not found'}), 404
     
     data = request.json
@@ -448,7 +722,8 @@ def update_order_status(order_id):
     
     if data['status'] == 'delivered':
         order.completed_at = datetime.utcnow()
-        partner.total_orders += 1
+        Partner.query.filter_by(id=partner_id).update(
+            {Partner.total_orders: Partner.total_orders + 1})
     
     db.session.commit()
     
@@ -459,28 +734,19 @@ def update_order_status(order_id):
 # ============================================================================
 
 @app.route('/api/admin/partners', methods=['GET'])
+@require_role('admin')
 def get_all_partners():
-    if 'user_id' not in session or session['role'] != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    partners = Partner.query.all()
+    rows = db.session.query(
+        Partner.id, Partner.business_name, Partner.city, Partner.status,
+        Partner.rating, Partner.total_orders, Partner.commission_rate,
+        Partner.created_at
+    ).all()
     
-    return jsonify([{
-        'id': p.id,
-        'business_name': p.business_name,
-        'city': p.city,
-        'status': p.status,
-        'rating': p.rating,
-        'total_orders': p.total_orders,
-        'commission_rate': p.commission_rate,
-        'created_at': p.created_at.isoformat()
-    } for p in partners])
+    return jsonify([dict(row._mapping) for row in rows])
 
 @app.route('/api/admin/partners/<int:partner_id>/approve', methods=['PUT'])
+@require_role('admin')
 def approve_partner(partner_id):
-    if 'user_id' not in session or session['role'] != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     partner = Partner.query.get(partner_id)
     if not partner:
         return jsonify({'error': 'Partner not found'}), 404
@@ -491,62 +757,65 @@ def approve_partner(partner_id):
     return jsonify({'message': 'Partner approved'})
 
 @app.route('/api/admin/orders', methods=['GET'])
+@require_role('admin')
 def get_all_orders():
-    if 'user_id' not in session or session['role'] != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     status_filter = request.args.get('status')
-    query = Order.query
+    query = db.session.query(
+        Order.id, Order.order_number, User.name.label('customer_name'),
+        Service.name.label('service_name'),
+        Partner.business_name.label('partner_name'), Order.status,
+        Order.total_price, Order.created_at
+    ).join(User, Order.customer_id == User.id).join(Service) \
+        .outerjoin(Partner, Order.partner_id == Partner.id)
     
     if status_filter:
-        query = query.filter_by(status=status_filter)
-    
-    orders = query.order_by(Order.created_at.desc()).limit(100).all()
+        query = query.filter(Order.status == status_filter)
     
-    return jsonify([{
-        'id': o.id,
-        'order_number': o.order_number,
-        'customer_name': o.customer.name,
-        'service_name': o.service.name,
-        'partner_name': o.partner.business_name if o.partner else None,
-        'status': o.status,
-        'total_price': o.total_price,
-        'created_at': o.created_at.isoformat()
-    } for o in orders])
+    query = query.order_by(Order.created_at.desc()).limit(100)
+
+    def generate():
+        for row in query.yield_per(50):
+            yield _ndjson_line(dict(row._mapping))
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route('/api/admin/orders/<int:order_id>/assign', methods=['PUT'])
+@require_role('admin')
 def assign_partner(order_id):
-    if 'user_id' not in session or session['role'] != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
     data = request.json
-    order = Order.query.get(order_id)
-    
+    order = db.session.get(Order, order_id)
+
     if not order:
         return jsonify({'error': 'Order not found'}), 404
-    
+
     order.partner_id = data['partner_id']
     order.status = 'assigned'
     db.session.commit()
     
     return jsonify({'message': 'Partner assigned successfully'})
 
-@app.route('/api/admin/analytics', methods=['GET'])
-def get_analytics():
-    if 'user_id' not in session or session['role'] != 'admin':
-        return jsonify({'error': 'Unauthorized'}), 403
-    
-    total_orders = Order.query.count()
-    total_revenue = db.session.query(db.func.sum(Order.total_price)).scalar() or 0
-    active_partners = Partner.query.filter_by(status='approved').count()
-    pending_orders = Order.query.filter_by(status='pending').count()
-    
-    return jsonify({
+@cache.cached(timeout=60, key_prefix='admin_analytics')
+def _compute_analytics():
+    """Aggregate the dashboard numbers in one pass over the order table"""
+    total_orders, total_revenue, pending_orders = db.session.query(
+        db.func.count(Order.id),
+        db.func.coalesce(db.func.sum(Order.total_price), 0),
+        db.func.coalesce(db.func.sum(db.case((Order.status == 'pending', 1), else_=0)), 0)
+    ).one()
+    active_partners = db.session.query(db.func.count(Partner.id)) \
+        .filter(Partner.status == 'approved').scalar()
+
+    return {
         'total_orders': total_orders,
         'total_revenue': float(total_revenue),
         'active_partners': active_partners,
-        'pending_orders': pending_orders
-    })
+        'pending_orders': int(pending_orders)
+    }
+
+@app.route('/api/admin/analytics', methods=['GET'])
+@require_role('admin')
+def get_analytics():
+    return jsonify(_compute_analytics())
 
 # ============================================================================
 # INITIALIZATION
@@ -556,7 +825,14 @@ def init_db():
     """Initialize database with sample data"""
     with app.app_context():
         db.create_all()
-        
+
+        # create_all skips tables that already exist, so indexes added to
+        # the models after a database was provisioned never get created;
+        # create them explicitly (no-op when they are already present)
+        for table in (Order.__table__, Coupon.__table__):
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+
         # Create admin user if not exists
         if not User.query.filter_by(phone='9999999999').first():
             admin = User(phone='9999999999', name='Admin User', role='admin')
@@ -22,12 +22,21 @@ async function apiCall(endpoint, method = 'GET', body = null) {
   
   try {
     const response = await fetch(`${API_BASE_URL}${endpoint}`, options);
-    const data = await response.json();
-    
+    const contentType = response.headers.get('Content-Type') || '';
+    let data;
+
+    if (contentType.includes('application/x-ndjson')) {
+      // Streamed list endpoints: one JSON object per line
+      const text = await response.text();
+      data = text.trim() ? text.trim().split('\n').map(line => JSON.parse(line)) : [];
+    } else {
+      data = await response.json();
+    }
+
     if (!response.ok) {
       throw new Error(data.error || 'Request failed');
     }
-    
+
     return data;
   } catch (error) {
     console.error('API Error:', error);